@@ -2,14 +2,25 @@ import streamlit as st
 import pandas as pd
 import json
 import copy
+import time
+import uuid
 from datetime import datetime
 from typing import List, Dict, Any, Union, Optional
 
 # Import project modules
-from config import app_config, ga_config
+from config import app_config, ga_config, profiles
 from ga_core.engine import run_ga_optimization
-from ga_core import chromosome
-from utils.helpers import convert_schedule_to_dataframe, parse_blocked_times, create_gantt_chart
+from ga_core.decomposition import run_rolling_horizon
+from ga_core.solver_service import SolverService, SessionLimitError
+from utils.helpers import (convert_schedule_to_dataframe, parse_blocked_times, create_gantt_chart,
+                           expand_task_instances, prepare_tasks_for_ga)
+
+# --- Shared solver service ---
+
+@st.cache_resource
+def get_solver_service() -> SolverService:
+    """Creates the process-wide solver service once and shares it across all sessions."""
+    return SolverService()
 
 # --- Helper functions for session state and data conversion ---
 
@@ -27,7 +38,7 @@ def initialize_session_state() -> None:
     if 'tasks' not in st.session_state:
         st.session_state.tasks: List[Dict[str, Any]] = [
             {"id": 1, "name": "Soạn báo cáo DSS", "estimated_time_hr": 1.0, "priority": 1, "category": "Công việc",
-             "predecessor_task_id": None, "deadline": "2025-08-04", "earliest_start_time": "2025-07-25"}
+             "predecessor_task_id": None, "deadline": "2025-08-04", "earliest_start_time": "2025-07-25", "recurrence": None}
         ]
     
     if 'active_data_source' not in st.session_state:
@@ -36,13 +47,19 @@ def initialize_session_state() -> None:
     if 'uploaded_tasks' not in st.session_state:
         st.session_state.uploaded_tasks: Optional[List[Dict[str, Any]]] = None
 
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id: str = uuid.uuid4().hex
+
+    if 'solver_job' not in st.session_state:
+        st.session_state.solver_job: Optional[Dict[str, Any]] = None
+
 def add_task() -> None:
     """Adds a new, empty task and sets the data source to manual."""
     max_id = max([task['id'] for task in st.session_state.tasks] or [0])
     new_task_id = max_id + 1
     st.session_state.tasks.append({
         "id": new_task_id, "name": "", "estimated_time_hr": 1.0, "priority": 3, "category": "",
-        "predecessor_task_id": None, "deadline": None, "earliest_start_time": None
+        "predecessor_task_id": None, "deadline": None, "earliest_start_time": None, "recurrence": None
     })
     # Set the active source to manual on interaction to prevent data loss
     st.session_state.active_data_source = 'manual'
@@ -75,33 +92,54 @@ def main() -> None:
     status_placeholder = st.sidebar.empty()
 
     st.sidebar.header("Cấu hình thuật toán")
-    ga_config.POPULATION_SIZE = st.sidebar.slider(
-        "Kích thước quần thể (Population Size)", 10, 500, ga_config.POPULATION_SIZE, 10
+    # GA parameters are collected per session and sent with the job, since the
+    # ga_config module is shared by every session in this server process.
+    # A saved profile (e.g. written by the ga_core.tuning harness) provides the slider defaults
+    profile_name = st.sidebar.selectbox("Cấu hình mẫu (Profile)", [None] + profiles.list_profiles(),
+                                        format_func=lambda name: name or "Mặc định")
+    defaults = {name: getattr(ga_config, name) for name in profiles.PROFILE_PARAMS}
+    if profile_name:
+        defaults.update(profiles.load_profile(profile_name))
+
+    ga_params: Dict[str, Any] = {'TOURNAMENT_SIZE': defaults['TOURNAMENT_SIZE']}
+    ga_params['POPULATION_SIZE'] = st.sidebar.slider(
+        "Kích thước quần thể (Population Size)", 10, 500, defaults['POPULATION_SIZE'], 10
     )
-    ga_config.N_GENERATIONS = st.sidebar.slider(
-        "Số thế hệ (Generations)", 10, 1000, ga_config.N_GENERATIONS, 10
+    ga_params['N_GENERATIONS'] = st.sidebar.slider(
+        "Số thế hệ (Generations)", 10, 1000, max(10, round(defaults['N_GENERATIONS'], -1)), 10
     )
-    ga_config.MUTATION_PROBABILITY = st.sidebar.slider(
-        "Tỷ lệ đột biến (Mutation Probability)", 0.01, 1.0, ga_config.MUTATION_PROBABILITY, 0.01
+    ga_params['MUTATION_PROBABILITY'] = st.sidebar.slider(
+        "Tỷ lệ đột biến (Mutation Probability)", 0.01, 1.0, defaults['MUTATION_PROBABILITY'], 0.01
     )
-    ga_config.CROSSOVER_PROBABILITY = st.sidebar.slider(
-        "Tỷ lệ lai ghép (Crossover Probability)", 0.1, 1.0, ga_config.CROSSOVER_PROBABILITY, 0.05
+    ga_params['CROSSOVER_PROBABILITY'] = st.sidebar.slider(
+        "Tỷ lệ lai ghép (Crossover Probability)", 0.1, 1.0, defaults['CROSSOVER_PROBABILITY'], 0.05
     )
-    ga_config.ELITE_SIZE = st.sidebar.slider(
-        "Elite Size (how many top solutions to keep)", 1, 10, int(ga_config.POPULATION_SIZE * 0.1), 1
+    elite_default = defaults['ELITE_SIZE'] if profile_name else int(ga_params['POPULATION_SIZE'] * 0.1)
+    ga_params['ELITE_SIZE'] = st.sidebar.slider(
+        "Elite Size (how many top solutions to keep)", 1, 10, max(1, min(10, elite_default)), 1
     )
     
     st.sidebar.subheader("Ràng buộc Thời gian")
+    horizon_days = st.sidebar.number_input(
+        "Số ngày lập lịch", min_value=1, max_value=90, value=app_config.DAYS_IN_SCHEDULE, step=1
+    )
     blocked_times_str = st.sidebar.text_area(
         "Khung giờ bận", value=app_config.DEFAULT_BLOCKED_TIMES, height=200
     )
     
     try:
-        blocked_slots = parse_blocked_times(blocked_times_str)
+        blocked_slots = parse_blocked_times(blocked_times_str, days=horizon_days)
     except Exception as e:
         st.sidebar.error(f"Lỗi xử lý khung giờ bận: {e}")
         st.stop()
 
+    with st.sidebar.expander("Trạng thái bộ giải"):
+        solver_metrics = get_solver_service().metrics()
+        st.metric("Hàng đợi", solver_metrics["queue_depth"])
+        st.metric("Đang chạy", f"{solver_metrics['running']}/{solver_metrics['max_workers']}")
+        st.metric("Độ trễ trung bình (s)", f"{solver_metrics['avg_wait_seconds'] + solver_metrics['avg_run_seconds']:.1f}")
+        st.metric("Độ trễ p95 (s)", f"{solver_metrics['p95_latency_seconds']:.1f}")
+
     # --- Main Screen Area ---
     # st.header("Tùy chọn Nhập liệu Công việc")
     
@@ -127,7 +165,7 @@ def main() -> None:
     with input_tab2:
         # st.subheader("2. Hoặc Nhập Công việc Thủ công")
 
-        header_cols = st.columns([0.5, 3, 1.5, 1, 2, 1.5, 1.5, 1.5, 0.5])
+        header_cols = st.columns([0.5, 3, 1.5, 1, 2, 1.5, 1.5, 1.5, 1.5, 0.5])
         header_cols[0].markdown("**ID**")
         header_cols[1].markdown("**Tên công việc**")
         header_cols[2].markdown("**Thời gian (h)**")
@@ -136,13 +174,14 @@ def main() -> None:
         header_cols[5].markdown("**Việc tiên quyết**")
         header_cols[6].markdown("**Deadline**")
         header_cols[7].markdown("**Bắt đầu sớm nhất**")
-        header_cols[8].markdown("**Xóa**")
+        header_cols[8].markdown("**Lặp lại**")
+        header_cols[9].markdown("**Xóa**")
         # st.divider()
 
         all_task_ids = [task['id'] for task in st.session_state.tasks]
 
         for task in st.session_state.tasks:
-            cols = st.columns([0.5, 3, 1.5, 1, 2, 1.5, 1.5, 1.5, 0.5])
+            cols = st.columns([0.5, 3, 1.5, 1, 2, 1.5, 1.5, 1.5, 1.5, 0.5])
             
             cols[0].write(f"#{task['id']}")
             task['name'] = cols[1].text_input("Name", value=task["name"], key=f"name_{task['id']}", label_visibility="collapsed")
@@ -160,7 +199,11 @@ def main() -> None:
             estart_date_obj = cols[7].date_input("Earliest Start", value=string_to_date_obj(task["earliest_start_time"]), key=f"estart_{task['id']}", label_visibility="collapsed")
             task['earliest_start_time'] = f"{estart_date_obj.isoformat()}T00:00:00" if estart_date_obj else None
 
-            cols[8].button("🗑️", key=f"delete_{task['id']}", on_click=delete_task, args=(task['id'],))
+            recurrence_options = [None, "daily", "weekdays", "weekends"]
+            current_recurrence_index = recurrence_options.index(task.get('recurrence')) if task.get('recurrence') in recurrence_options else 0
+            task['recurrence'] = cols[8].selectbox("Recurrence", options=recurrence_options, index=current_recurrence_index, key=f"recurrence_{task['id']}", label_visibility="collapsed")
+
+            cols[9].button("🗑️", key=f"delete_{task['id']}", on_click=delete_task, args=(task['id'],))
 
         st.divider()
         
@@ -205,20 +248,7 @@ def main() -> None:
 
     # --- Final Task Processing and Display ---
     if tasks:
-        for task in tasks:
-            processed_task = task.copy()
-            time_in_hours = processed_task.pop('estimated_time_hr', task.get('estimated_time'))
-            if time_in_hours is not None:
-                try:
-                    slots = int(float(time_in_hours) * 60 / app_config.TIME_SLOT_DURATION)
-                    processed_task['estimated_time'] = max(1, slots)
-                except (ValueError, TypeError):
-                    processed_task['estimated_time'] = 1
-            
-            for key in ['predecessor_task_id', 'deadline', 'earliest_start_time']:
-                if not processed_task.get(key):
-                    processed_task[key] = None
-            final_tasks_for_ga.append(processed_task)
+        final_tasks_for_ga = prepare_tasks_for_ga(tasks)
         
         st.header("Danh sách công việc cần sắp xếp")
         task_for_display = copy.deepcopy(final_tasks_for_ga)  # Use a deep copy to avoid modifying the original data
@@ -229,58 +259,108 @@ def main() -> None:
     
         if st.button("Tạo Lịch Trình", type="primary", use_container_width=True):
             if final_tasks_for_ga:
-                with st.spinner("Thuật toán di truyền đang tính toán..."):
-                    
-                    task_instances: List[Dict[str, Any]] = []
-                    for i, task_data in enumerate(final_tasks_for_ga):
-                        instance = task_data.copy()
-                        instance['instance_id'] = f"task_{i}"
-                        instance['original_id'] = task_data.get('id', i)
-                        task_instances.append(instance)
-                    
-                    tasks_map: Dict[str, Dict[str, Any]] = {task['instance_id']: task for task in task_instances}
-
-                    progress_bar = st.progress(0.0, text="Bắt đầu...")
-                    status_text = st.empty()
-                    
-                    def progress_callback(progress_value: float, message: str) -> None:
-                        progress_bar.progress(progress_value)
-                        status_text.text(message)
-
-                    best_individual, logbook = run_ga_optimization(
-                        tasks_map=tasks_map,
-                        task_instances=task_instances,
-                        blocked_slots=blocked_slots,
-                        progress_callback=progress_callback
-                    )
+                # Recurring tasks are expanded into one instance per occurrence
+                task_instances: List[Dict[str, Any]] = expand_task_instances(final_tasks_for_ga, days=horizon_days)
+                
+                tasks_map: Dict[str, Dict[str, Any]] = {task['instance_id']: task for task in task_instances}
+
+                solve_kwargs: Dict[str, Any] = {
+                    "tasks_map": tasks_map,
+                    "task_instances": task_instances,
+                    "blocked_slots": blocked_slots,
+                }
+                # Other horizons go through the rolling-horizon solver, which splits
+                # long horizons into overlapping windows. The job already runs in a
+                # service worker, so it only gets that worker's share of the CPUs.
+                if horizon_days == app_config.DAYS_IN_SCHEDULE:
+                    solve_fn = run_ga_optimization
+                else:
+                    solve_fn = run_rolling_horizon
+                    solve_kwargs["horizon_days"] = horizon_days
+                    solve_kwargs["max_workers"] = app_config.SOLVER_WINDOW_WORKERS
 
-                    st.header("Đã tìm thấy lịch trình tối ưu")
-                    
-                    final_schedule = best_individual[0]
-                    final_fitness = final_schedule.fitness.values[0]
-
-                    col1, col2, col3 = st.columns(3)
-                    col1.metric("Điểm Fitness cuối cùng", f"{final_fitness:,.0f}")
-                    col2.metric("Tổng số công việc", f"{len(final_schedule)}")
-                    col3.metric("Số thế hệ", f"{ga_config.N_GENERATIONS}")
-
-                    if not final_schedule or final_fitness == 0.0:
-                        st.warning("Không tìm thấy lịch trình hợp lệ. Hãy thử tăng số thế hệ, kích thước quần thể, hoặc điều chỉnh các ràng buộc.")
-                    else:
-                        schedule_df = convert_schedule_to_dataframe(final_schedule, tasks_map)
-                        
-                        fig = create_gantt_chart(schedule_df)
-                        st.plotly_chart(fig, use_container_width=True)
-
-                        st.subheader("Chi tiết Lịch trình")
-                        st.dataframe(schedule_df.sort_values(by="Start").reset_index(drop=True), use_container_width=True)
-                        
-                        st.subheader("Log")
-                        log_df = pd.DataFrame(logbook)
-                        log_df = log_df[['gen', 'avg', 'fitness']]
-                        st.dataframe(log_df, use_container_width=True)
+                try:
+                    job = get_solver_service().submit(
+                        st.session_state.session_id,
+                        solve_fn,
+                        kwargs=solve_kwargs,
+                        ga_params=ga_params,
+                    )
+                except SessionLimitError:
+                    st.warning("Bạn đang có một lịch trình khác đang được tính toán. Vui lòng chờ hoàn tất.")
+                    st.stop()
+
+                # The job outlives this script run: widget changes rerun the script
+                # and the next run reattaches to the job instead of abandoning it
+                st.session_state.solver_job = {
+                    "job_id": job.job_id,
+                    "tasks_map": tasks_map,
+                    "n_generations": ga_params['N_GENERATIONS'],
+                }
             else:
                 st.warning("Không có công việc nào để sắp xếp. Vui lòng tải tệp lên hoặc nhập thủ công.")
 
+        if st.session_state.solver_job:
+            show_solver_job(st.session_state.solver_job)
+
+def show_solver_job(solver_job: Dict[str, Any]) -> None:
+    """Waits for the session's solver job, then displays the resulting schedule."""
+    solver_service = get_solver_service()
+    job = solver_service.get_job(solver_job['job_id'])
+    if job is None:
+        # The job was discarded (e.g. after SOLVER_FINISHED_JOB_TTL) or the server restarted
+        st.session_state.solver_job = None
+        st.info("Kết quả lịch trình trước đó không còn khả dụng. Vui lòng tạo lại lịch trình.")
+        return
+
+    with st.spinner("Thuật toán di truyền đang tính toán..."):
+        progress_bar = st.progress(0.0, text="Bắt đầu...")
+        status_text = st.empty()
+
+        while not job.done():
+            queue_position = solver_service.queue_position(job.job_id)
+            if queue_position:
+                progress_bar.progress(0.0, text=f"Đang chờ trong hàng đợi (vị trí {queue_position})...")
+            else:
+                progress_bar.progress(job.progress, text="Đang tính toán...")
+                status_text.text(job.message)
+            time.sleep(app_config.SOLVER_POLL_INTERVAL)
+
+        st.session_state.solver_job = None
+        try:
+            best_individual, logbook = solver_service.collect(job.job_id)
+        except Exception as e:
+            st.error(f"Lỗi khi chạy thuật toán: {e}")
+            return
+        progress_bar.progress(1.0, text="Hoàn tất")
+
+    tasks_map = solver_job['tasks_map']
+
+    st.header("Đã tìm thấy lịch trình tối ưu")
+    
+    final_schedule = best_individual[0]
+    final_fitness = final_schedule.fitness.values[0]
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Điểm Fitness cuối cùng", f"{final_fitness:,.0f}")
+    col2.metric("Tổng số công việc", f"{len(final_schedule)}")
+    col3.metric("Số thế hệ", f"{solver_job['n_generations']}")
+
+    if not final_schedule or final_fitness == 0.0:
+        st.warning("Không tìm thấy lịch trình hợp lệ. Hãy thử tăng số thế hệ, kích thước quần thể, hoặc điều chỉnh các ràng buộc.")
+    else:
+        schedule_df = convert_schedule_to_dataframe(final_schedule, tasks_map)
+        
+        fig = create_gantt_chart(schedule_df)
+        st.plotly_chart(fig, use_container_width=True)
+
+        st.subheader("Chi tiết Lịch trình")
+        st.dataframe(schedule_df.sort_values(by="Start").reset_index(drop=True), use_container_width=True)
+        
+        st.subheader("Log")
+        log_df = pd.DataFrame(logbook)
+        log_df = log_df[['gen', 'avg', 'fitness']]
+        st.dataframe(log_df, use_container_width=True)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Measures solver cold-start cost: module import times in fresh interpreters and
+the time for a process pool to start and run its first solver call, both for
+the first pool of a fresh interpreter and for a pool started after it.
+
+Run from the project root:
+    python -m benchmarks.startup_benchmark
+"""
+import multiprocessing
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ga_core.workers import PRELOAD_MODULES
+
+IMPORT_TARGETS = ["ga_core.engine", "ga_core.solver_service", "ga_core.decomposition", "utils.helpers"]
+REPEATS = 5
+POOL_WORKERS = 2
+
+def _import_seconds(module):
+    """Imports a module in a fresh interpreter and returns the elapsed time."""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return float(output)
+
+def _load_solver(_):
+    import ga_core.engine  # noqa: F401 - the import itself is what is being measured
+    return True
+
+def _pool_startup_seconds(context):
+    """Time from creating a pool until every worker has loaded the solver."""
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=POOL_WORKERS, mp_context=context) as executor:
+        list(executor.map(_load_solver, range(POOL_WORKERS)))
+    return time.perf_counter() - start
+
+def _pool_timings(start_method):
+    """
+    Runs in a fresh interpreter: times a first (cold) pool and a second (warm)
+    pool. For forkserver the cold figure includes starting the server and its
+    preload, which the warm figure reuses.
+    """
+    context = multiprocessing.get_context(start_method)
+    if start_method == "forkserver":
+        context.set_forkserver_preload(PRELOAD_MODULES)
+    print(_pool_startup_seconds(context), _pool_startup_seconds(context))
+
+def _pool_samples(start_method):
+    """Returns (cold, warm) seconds measured in a new interpreter."""
+    code = f"from benchmarks.startup_benchmark import _pool_timings; _pool_timings({start_method!r})"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    cold, warm = output.split()
+    return float(cold), float(warm)
+
+def main():
+    print(f"Import time (median of {REPEATS} cold starts)")
+    for module in IMPORT_TARGETS:
+        samples = [_import_seconds(module) for _ in range(REPEATS)]
+        print(f"  {module:<25} {statistics.median(samples) * 1000:8.1f} ms")
+
+    # Every sample starts a new interpreter, so the cold column pays for any
+    # fork server start-up; the warm column is a second pool in that interpreter
+    print(f"Pool start-up with {POOL_WORKERS} workers (median of {REPEATS} fresh interpreters)")
+    print(f"  {'':<25} {'cold':>8}    {'warm':>8}")
+    start_methods = {"spawn": "spawn"}
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        start_methods["forkserver (preloaded)"] = "forkserver"
+    for name, start_method in start_methods.items():
+        samples = [_pool_samples(start_method) for _ in range(REPEATS)]
+        cold = statistics.median(sample[0] for sample in samples)
+        warm = statistics.median(sample[1] for sample in samples)
+        print(f"  {name:<25} {cold * 1000:8.1f} ms {warm * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
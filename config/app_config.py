@@ -1,3 +1,5 @@
+import os
+
 # Duration of each time slot in minutes
 TIME_SLOT_DURATION = 30
 
@@ -21,3 +23,23 @@ daily 12:00-13:00
 # Dinner (Daily 7 PM to 8 PM)
 daily 19:00-20:00
 """
+
+# --- Solver Service ---
+# Number of worker processes shared by all Streamlit sessions
+SOLVER_MAX_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+# Window processes a rolling-horizon job may start inside a solver worker; the CPUs
+# are shared by all service workers, so this is usually 1 (windows solved in turn)
+SOLVER_WINDOW_WORKERS = max(1, (os.cpu_count() or 2) // SOLVER_MAX_WORKERS)
+
+# Maximum number of queued or running jobs a single session may have
+SOLVER_MAX_JOBS_PER_SESSION = 1
+
+# Seconds between progress updates while a session waits for its job
+SOLVER_POLL_INTERVAL = 0.2
+
+# Seconds a finished but uncollected job is kept before it is discarded
+SOLVER_FINISHED_JOB_TTL = 600
+
+# Number of recent jobs used for the latency metrics
+SOLVER_METRICS_WINDOW = 200
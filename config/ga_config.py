@@ -33,4 +33,32 @@ FITNESS_WEIGHTS = {
 }
 
 # --- Fitness Score Scaling ---
-MAX_FITNESS_SCORE = 100000
\ No newline at end of file
+MAX_FITNESS_SCORE = 100000
+
+# --- Fitness Cache ---
+# Maximum number of evaluated schedules remembered during a run; the cache is cleared when full
+FITNESS_CACHE_SIZE = 50000
+
+# --- Checkpoint Parameters ---
+# A checkpoint is written every N generations or every N seconds, whichever comes first
+CHECKPOINT_EVERY_N_GENERATIONS = 25
+CHECKPOINT_EVERY_SECONDS = 60
+
+# --- Rolling-Horizon Decomposition ---
+# Long horizons are split into overlapping windows that are solved in parallel
+WINDOW_DAYS = 7
+WINDOW_OVERLAP_DAYS = 1
+
+# Fraction of a window's free time that may be filled with tasks owned by that window
+WINDOW_LOAD_FACTOR = 0.7
+
+# Number of worker processes used to solve windows (None = number of CPUs)
+DECOMPOSITION_MAX_WORKERS = None
+
+# --- Initialization Parameters ---
+# Share of the initial population seeded with heuristic task orders
+# (earliest deadline first, highest priority first); the rest is random
+INIT_HEURISTIC_SEEDS = {
+    "deadline": 0.05,
+    "priority": 0.05
+}
@@ -0,0 +1,58 @@
+import json
+import os
+from contextlib import contextmanager
+from config import ga_config
+
+# Named GA configuration profiles are stored as JSON files in this directory
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ga_profiles")
+
+# GA parameters a profile may set
+PROFILE_PARAMS = (
+    "POPULATION_SIZE", "N_GENERATIONS", "CROSSOVER_PROBABILITY",
+    "MUTATION_PROBABILITY", "TOURNAMENT_SIZE", "ELITE_SIZE",
+)
+
+def list_profiles():
+    """Returns the names of all saved profiles."""
+    if not os.path.isdir(PROFILES_DIR):
+        return []
+    return sorted(name[:-len(".json")] for name in os.listdir(PROFILES_DIR) if name.endswith(".json"))
+
+def load_profile(name):
+    """Reads a profile and returns its GA parameters as a dictionary."""
+    path = os.path.join(PROFILES_DIR, f"{name}.json")
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            profile = json.load(f)
+    except FileNotFoundError:
+        raise ValueError(f"Unknown GA profile '{name}'. Available: {', '.join(list_profiles()) or 'none'}")
+    return {key: value for key, value in profile.get("params", {}).items() if key in PROFILE_PARAMS}
+
+@contextmanager
+def override_params(params):
+    """Temporarily sets the given ga_config values, restoring the previous ones on exit."""
+    saved = {key: getattr(ga_config, key) for key in params}
+    for key, value in params.items():
+        setattr(ga_config, key, value)
+    try:
+        yield params
+    finally:
+        for key, value in saved.items():
+            setattr(ga_config, key, value)
+
+@contextmanager
+def apply_profile(name):
+    """Temporarily overrides the matching ga_config values with a profile's parameters."""
+    with override_params(load_profile(name)) as params:
+        yield params
+
+def save_profile(name, params, metadata=None):
+    """Writes a profile; metadata (e.g. how it was tuned) is stored alongside the parameters."""
+    os.makedirs(PROFILES_DIR, exist_ok=True)
+    profile = {"params": {key: params[key] for key in PROFILE_PARAMS if key in params}}
+    if metadata:
+        profile["metadata"] = metadata
+    path = os.path.join(PROFILES_DIR, f"{name}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, indent=4, ensure_ascii=False)
+    return path
@@ -1,7 +1,16 @@
 from deap import base, creator
 
-creator.create("FitnessMax", base.Fitness, weights=(1.0,))
+def register_types():
+    """
+    Registers the DEAP fitness and individual classes and returns the Individual class.
+    Safe to call any number of times; importing this module has no side effects.
+    """
+    if not hasattr(creator, "FitnessMax"):
+        creator.create("FitnessMax", base.Fitness, weights=(1.0,))
 
-# Create the Individual class. It will be a list of tuples, where each
-# tuple is (task_id, start_time_slot). The individual now has the FitnessMax attribute.
-creator.create("Individual", list, fitness=creator.FitnessMax)
\ No newline at end of file
+    # Create the Individual class. It will be a list of tuples, where each
+    # tuple is (task_id, start_time_slot). The individual now has the FitnessMax attribute.
+    if not hasattr(creator, "Individual"):
+        creator.create("Individual", list, fitness=creator.FitnessMax)
+
+    return creator.Individual
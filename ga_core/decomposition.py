@@ -0,0 +1,286 @@
+import heapq
+import math
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import numpy as np
+from deap import tools
+from config import app_config, ga_config
+from ga_core import chromosome, fitness
+from ga_core.operators import iso_to_slot
+from ga_core.engine import GA_PARAM_NAMES, run_ga_optimization
+from ga_core.workers import get_worker_context
+
+@contextmanager
+def schedule_horizon(days):
+    """Temporarily sets the number of days (and slots) in the schedule."""
+    saved = (app_config.DAYS_IN_SCHEDULE, app_config.TOTAL_TIME_SLOTS)
+    app_config.DAYS_IN_SCHEDULE = days
+    app_config.TOTAL_TIME_SLOTS = days * app_config.SLOTS_PER_DAY
+    try:
+        yield
+    finally:
+        app_config.DAYS_IN_SCHEDULE, app_config.TOTAL_TIME_SLOTS = saved
+
+def _shift_iso(value, days):
+    """Moves an ISO datetime string back by the given number of days."""
+    try:
+        return (datetime.fromisoformat(value) - timedelta(days=days)).isoformat()
+    except (ValueError, TypeError):
+        return value
+
+def _predecessor_map(task_instances):
+    """Maps each instance id to its predecessor's instance id, matching calculate_fitness."""
+    first_instance_by_original = {}
+    for task in task_instances:
+        first_instance_by_original.setdefault(task.get('original_id'), task['instance_id'])
+
+    predecessor_of = {}
+    for task in task_instances:
+        pred_id = task.get('predecessor_task_id')
+        if pred_id and pred_id in first_instance_by_original:
+            predecessor_of[task['instance_id']] = first_instance_by_original[pred_id]
+    return predecessor_of
+
+def _topological_order(task_instances, predecessor_of):
+    """
+    Orders instances so that predecessors come first, otherwise keeping the input
+    order as closely as possible. Instances in a precedence cycle are appended last.
+    """
+    index_of = {task['instance_id']: i for i, task in enumerate(task_instances)}
+    successors = {}
+    ready = []
+    for i, task in enumerate(task_instances):
+        pred_instance_id = predecessor_of.get(task['instance_id'])
+        if pred_instance_id in index_of and pred_instance_id != task['instance_id']:
+            successors.setdefault(pred_instance_id, []).append(i)
+        else:
+            heapq.heappush(ready, i)
+
+    order = []
+    visited = set()
+    while ready:
+        i = heapq.heappop(ready)
+        order.append(task_instances[i])
+        visited.add(i)
+        for successor in successors.get(task_instances[i]['instance_id'], []):
+            heapq.heappush(ready, successor)
+
+    order.extend(task for i, task in enumerate(task_instances) if i not in visited)
+    return order
+
+def plan_windows(horizon_days, window_days, overlap_days):
+    """Returns (start_day, length_days) for overlapping windows covering the horizon."""
+    stride = max(1, window_days - overlap_days)
+    windows = []
+    start_day = 0
+    while True:
+        length = min(window_days, horizon_days - start_day)
+        windows.append((start_day, length))
+        if start_day + length >= horizon_days:
+            return windows
+        start_day += stride
+
+def assign_tasks_to_windows(task_instances, blocked_slots, windows):
+    """
+    Assigns every task instance to exactly one window, using earliest starts,
+    deadlines, precedence and occurrence days (a recurring instance always goes
+    to a window containing its day). Tasks fill the earliest window that still has
+    capacity, so work is spread instead of piling up in the first window.
+    """
+    spd = app_config.SLOTS_PER_DAY
+    schedule_start_dt = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    predecessor_of = _predecessor_map(task_instances)
+
+    # Capacity counts only the part of a window not shared with the next one
+    capacities = []
+    for w, (start_day, length) in enumerate(windows):
+        core_end_day = windows[w + 1][0] if w + 1 < len(windows) else start_day + length
+        core_slots = range(start_day * spd, core_end_day * spd)
+        free_slots = sum(1 for slot in core_slots if slot not in blocked_slots)
+        capacities.append(free_slots * ga_config.WINDOW_LOAD_FACTOR)
+    loads = [0.0] * len(windows)
+
+    def window_of_slot(slot):
+        day = max(0, int(slot // spd))
+        return max(w for w, (start_day, _) in enumerate(windows) if start_day <= day)
+
+    window_of_task = {}
+    for task in _topological_order(task_instances, predecessor_of):
+        duration = task.get('estimated_time', 1)
+
+        release = iso_to_slot(task.get('earliest_start_time'), schedule_start_dt)
+        first = window_of_slot(math.ceil(release)) if release else 0
+
+        pred_instance_id = predecessor_of.get(task['instance_id'])
+        if pred_instance_id in window_of_task:
+            first = max(first, window_of_task[pred_instance_id])
+
+        due = iso_to_slot(task.get('deadline'), schedule_start_dt)
+        last = max(first, window_of_slot(due - duration)) if due is not None else len(windows) - 1
+
+        day = task.get('occurrence_day')
+        containing = [w for w, (start_day, length) in enumerate(windows)
+                      if day is not None and start_day <= day < start_day + length]
+        if containing:
+            # The occurrence day is a hard bound: only windows containing it qualify
+            first = min(max(first, containing[0]), containing[-1])
+            last = containing[-1]
+
+        candidates = range(first, last + 1)
+        chosen = next((w for w in candidates if loads[w] + duration <= capacities[w]), None)
+        if chosen is None:
+            chosen = max(candidates, key=lambda w: capacities[w] - loads[w])
+
+        window_of_task[task['instance_id']] = chosen
+        loads[chosen] += duration
+
+    return window_of_task
+
+def _solve_window(window_days, tasks_map, task_instances, blocked_slots, ga_params, seed):
+    """Solves one window's subproblem; runs inside a worker process."""
+    saved_params = {name: getattr(ga_config, name) for name in ga_params}
+    for name, value in ga_params.items():
+        setattr(ga_config, name, value)
+    try:
+        with schedule_horizon(window_days):
+            best_individual, logbook = run_ga_optimization(
+                tasks_map, task_instances, blocked_slots, progress_callback=lambda *_: None, seed=seed
+            )
+    finally:
+        for name, value in saved_params.items():
+            setattr(ga_config, name, value)
+    return list(best_individual[0]), list(logbook)
+
+def _solve_windows(subproblems, max_workers):
+    """Yields (offset, result) per window as windows finish, in parallel when worthwhile."""
+    if len(subproblems) <= 1 or max_workers == 1:
+        # Not worth the process start-up cost
+        for offset, args in subproblems:
+            yield offset, _solve_window(*args)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=get_worker_context()) as executor:
+        futures = {executor.submit(_solve_window, *args): offset for offset, args in subproblems}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+def repair_schedule_globally(schedule, tasks_map, blocked_slots, horizon_slots):
+    """
+    Reconciles stitched window schedules: tasks are visited in start order
+    (predecessors first) and moved to the first free slot at or after their
+    proposed start that respects blocked time, earliest start, occurrence day and
+    precedence, or else to the first such slot anywhere in their allowed range.
+    """
+    schedule_start_dt = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    predecessor_of = _predecessor_map(list(tasks_map.values()))
+    proposed = dict(schedule)
+
+    ordered = sorted(tasks_map.values(), key=lambda t: proposed.get(t['instance_id'], 0))
+    occupied = set(blocked_slots)
+    finish_of = {}
+    repaired = []
+
+    for task in _topological_order(ordered, predecessor_of):
+        task_id = task['instance_id']
+        duration = task.get('estimated_time', 1)
+
+        # Earliest start the constraints allow, independent of the proposal
+        earliest = 0
+        release = iso_to_slot(task.get('earliest_start_time'), schedule_start_dt)
+        if release is not None:
+            earliest = max(earliest, math.ceil(release))
+        pred_instance_id = predecessor_of.get(task_id)
+        if pred_instance_id in finish_of:
+            earliest = max(earliest, finish_of[pred_instance_id])
+        latest_end = horizon_slots
+        if task.get('occurrence_day') is not None:
+            # Recurring instances stay within their occurrence day
+            earliest = max(earliest, task['occurrence_day'] * app_config.SLOTS_PER_DAY)
+            latest_end = min(latest_end, (task['occurrence_day'] + 1) * app_config.SLOTS_PER_DAY)
+
+        def first_free(begin):
+            return next((s for s in range(begin, latest_end - duration + 1)
+                         if not any(slot in occupied for slot in range(s, s + duration))), None)
+
+        # Keep the task close to its proposal; only if nothing fits at or after it,
+        # fall back to the whole allowed range
+        start = first_free(max(earliest, proposed.get(task_id, 0)))
+        if start is None:
+            start = first_free(earliest)
+        if start is None:
+            # No room anywhere in its allowed range; keep the proposal and let the fitness penalize it
+            start = proposed.get(task_id, 0)
+        else:
+            occupied.update(range(start, start + duration))
+
+        finish_of[task_id] = start + duration
+        repaired.append((task_id, start))
+
+    return repaired
+
+def run_rolling_horizon(tasks_map, task_instances, blocked_slots, progress_callback,
+                        horizon_days, window_days=None, overlap_days=None, max_workers=None, seed=None):
+    """
+    Solves a long horizon by splitting it into overlapping windows, solving each
+    window in parallel, then stitching and repairing the result.
+    Returns the same (best_individual, logbook) pair as run_ga_optimization.
+    """
+    window_days = window_days or ga_config.WINDOW_DAYS
+    overlap_days = ga_config.WINDOW_OVERLAP_DAYS if overlap_days is None else overlap_days
+    max_workers = max_workers or ga_config.DECOMPOSITION_MAX_WORKERS
+    spd = app_config.SLOTS_PER_DAY
+
+    windows = plan_windows(horizon_days, window_days, overlap_days)
+    window_of_task = assign_tasks_to_windows(task_instances, blocked_slots, windows)
+    ga_params = {name: getattr(ga_config, name) for name in GA_PARAM_NAMES}
+
+    # Build each window's subproblem in window-local slots and dates
+    subproblems = []
+    for w, (start_day, length) in enumerate(windows):
+        offset = start_day * spd
+        local_instances = []
+        for task in task_instances:
+            if window_of_task[task['instance_id']] != w:
+                continue
+            local_task = task.copy()
+            for key in ('deadline', 'earliest_start_time'):
+                if local_task.get(key):
+                    local_task[key] = _shift_iso(local_task[key], start_day)
+            if local_task.get('occurrence_day') is not None:
+                local_task['occurrence_day'] -= start_day
+            local_instances.append(local_task)
+        if not local_instances:
+            continue
+        local_blocked = {slot - offset for slot in blocked_slots if offset <= slot < offset + length * spd}
+        local_map = {task['instance_id']: task for task in local_instances}
+        window_seed = None if seed is None else seed + w
+        subproblems.append((offset, (length, local_map, local_instances, local_blocked, ga_params, window_seed)))
+
+    stitched = []
+    window_logbooks = []
+    for done_count, (offset, (local_schedule, window_logbook)) in enumerate(
+            _solve_windows(subproblems, max_workers), start=1):
+        stitched.extend((task_id, start + offset) for task_id, start in local_schedule)
+        window_logbooks.append(window_logbook)
+        progress_callback(0.9 * done_count / len(subproblems),
+                          f"Window {done_count}/{len(subproblems)} solved")
+
+    progress_callback(0.9, "Reconciling window boundaries...")
+    with schedule_horizon(horizon_days):
+        repaired = repair_schedule_globally(stitched, tasks_map, blocked_slots, app_config.TOTAL_TIME_SLOTS)
+        best = chromosome.register_types()(repaired)
+        best.fitness.values = fitness.calculate_fitness(best, tasks_map=tasks_map, blocked_slots=blocked_slots)
+
+    # Window fitnesses are not comparable to each other, so the log shows their mean per generation
+    logbook = tools.Logbook()
+    logbook.header = "gen", "avg", "fitness"
+    for records in zip(*window_logbooks):
+        logbook.record(gen=records[0]['gen'],
+                       avg=float(np.mean([rec['avg'] for rec in records])),
+                       fitness=float(np.mean([rec['fitness'] for rec in records])))
+
+    best_score = best.fitness.values[0]
+    progress_callback(1.0, f"{len(subproblems)} windows solved - Best Score: {best_score:.4f}")
+    return [best], logbook
@@ -1,71 +1,248 @@
+import json
+import os
 import random
+import time
 import numpy as np
-from deap import base, tools, creator
-from config import ga_config
+from deap import base, tools
+from config import ga_config, profiles
 from ga_core import operators, fitness, chromosome
 
-def run_ga_optimization(tasks_map, task_instances, blocked_slots, progress_callback):
+CHECKPOINT_FILE = "checkpoint.npz"
+LOGBOOK_FILE = "logbook.jsonl"
+
+# GA parameters that define a run; stored in checkpoints and passed to worker processes
+GA_PARAM_NAMES = profiles.PROFILE_PARAMS
+
+def _make_cached_evaluate(tasks_map, blocked_slots, group_of):
     """
-    Sets up and runs the genetic algorithm.
+    Wraps calculate_fitness with symmetry breaking and a fitness cache. Schedules are
+    canonicalized first, so permutations of identical recurring instances share one entry.
     """
+    cache = {}
+
+    def evaluate(individual):
+        operators.canonicalize_schedule(individual, group_of)
+        key = tuple(sorted(individual))
+        fit = cache.get(key)
+        if fit is None:
+            fit = fitness.calculate_fitness(individual, tasks_map=tasks_map, blocked_slots=blocked_slots)
+            if len(cache) >= ga_config.FITNESS_CACHE_SIZE:
+                cache.clear()
+            cache[key] = fit
+        else:
+            # calculate_fitness sorts the schedule in place; keep the same layout on a cache hit
+            individual.sort(key=lambda x: x[1])
+        return fit
+
+    return evaluate
+
+def _build_toolbox(tasks_map, task_instances, blocked_slots):
+    """Registers the GA operators for one problem instance."""
     toolbox = base.Toolbox()
+    group_of = operators.get_recurrence_groups(task_instances)
 
-    toolbox.register("individual", operators.create_random_schedule, creator.Individual, 
+    individual_class = chromosome.register_types()
+    toolbox.register("individual", operators.create_random_schedule, individual_class,
+                     task_instances=task_instances, blocked_slots=blocked_slots)
+    # The whole starting population is generated in one vectorized batch
+    toolbox.register("population", operators.create_population, individual_class,
                      task_instances=task_instances, blocked_slots=blocked_slots)
-    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
 
-    toolbox.register("evaluate", fitness.calculate_fitness, tasks_map=tasks_map, blocked_slots=blocked_slots)
+    toolbox.register("evaluate", _make_cached_evaluate(tasks_map, blocked_slots, group_of))
     toolbox.register("mate", operators.custom_crossover, task_instances=task_instances)
-    toolbox.register("mutate", operators.custom_mutation, blocked_slots=blocked_slots)
+    toolbox.register("mutate", operators.custom_mutation, blocked_slots=blocked_slots, group_of=group_of,
+                     windows=operators.get_occurrence_windows(task_instances))
     toolbox.register("select", tools.selTournament, tournsize=ga_config.TOURNAMENT_SIZE)
+    return toolbox
+
+def run_ga_optimization(tasks_map, task_instances, blocked_slots, progress_callback,
+                        seed=None, checkpoint_dir=None, profile=None, time_limit=None):
+    """
+    Sets up and runs the genetic algorithm.
+    If checkpoint_dir is given, the run is periodically checkpointed there and
+    can be continued with resume_ga_optimization.
+    profile names a saved GA configuration (see config.profiles) to run with, and
+    time_limit stops the run after the generation in which it is exceeded (seconds).
+    """
+    if profile:
+        # The profile only applies to this run; ga_config is restored afterwards
+        with profiles.apply_profile(profile):
+            return run_ga_optimization(tasks_map, task_instances, blocked_slots, progress_callback,
+                                       seed=seed, checkpoint_dir=checkpoint_dir, time_limit=time_limit)
+    if seed is not None:
+        random.seed(seed)
+
+    toolbox = _build_toolbox(tasks_map, task_instances, blocked_slots)
 
     population = toolbox.population(n=ga_config.POPULATION_SIZE)
-    
+
+    fitnesses = map(toolbox.evaluate, population)
+    for ind, fit in zip(population, fitnesses):
+        ind.fitness.values = fit
+
+    if checkpoint_dir:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        # Start a fresh log; records of any previous run in this directory are discarded
+        open(os.path.join(checkpoint_dir, LOGBOOK_FILE), 'w').close()
+
+    return _evolve(toolbox, population, 0, progress_callback, checkpoint_dir, time_limit)
+
+def resume_ga_optimization(tasks_map, task_instances, blocked_slots, progress_callback, checkpoint_dir):
+    """
+    Continues a run from the latest checkpoint in checkpoint_dir.
+    With the same tasks and blocked slots the result is identical to an uninterrupted run.
+    """
+    population, start_gen, ga_params = load_checkpoint(checkpoint_dir)
+
+    # Drop log records written after the checkpoint; they will be produced again
+    records = [rec for rec in _read_logbook_records(checkpoint_dir) if rec['gen'] <= start_gen]
+    with open(os.path.join(checkpoint_dir, LOGBOOK_FILE), 'w', encoding='utf-8') as f:
+        for rec in records:
+            f.write(json.dumps(rec) + '\n')
+
+    # The checkpoint's GA parameters only apply to the resumed run
+    with profiles.override_params(ga_params):
+        toolbox = _build_toolbox(tasks_map, task_instances, blocked_slots)
+        return _evolve(toolbox, population, start_gen, progress_callback, checkpoint_dir)
+
+def _evolve(toolbox, population, start_gen, progress_callback, checkpoint_dir, time_limit=None):
+    """Runs the generational loop from start_gen until N_GENERATIONS or the time limit."""
     stats = tools.Statistics(lambda ind: ind.fitness.values)
     stats.register("avg", np.mean)
     # stats.register("min", np.min)
     stats.register("fitness", np.max)
-    
+
     logbook = tools.Logbook()
     logbook.header = "gen", "avg", "fitness"
 
-    fitnesses = map(toolbox.evaluate, population)
-    for ind, fit in zip(population, fitnesses):
-        ind.fitness.values = fit
+    log_file = open(os.path.join(checkpoint_dir, LOGBOOK_FILE), 'a', encoding='utf-8') if checkpoint_dir else None
+    last_checkpoint_time = start_time = time.monotonic()
+
+    try:
+        for gen in range(start_gen, ga_config.N_GENERATIONS):
+            elites = tools.selBest(population, k=ga_config.ELITE_SIZE)
+            elites = [toolbox.clone(el) for el in elites]
+
+            offspring = toolbox.select(population, len(population) - ga_config.ELITE_SIZE)
+            offspring = [toolbox.clone(ind) for ind in offspring]
 
-    for gen in range(ga_config.N_GENERATIONS):
-        elites = tools.selBest(population, k=ga_config.ELITE_SIZE)
-        elites = [toolbox.clone(el) for el in elites]
+            for child1, child2 in zip(offspring[::2], offspring[1::2]):
+                if random.random() < ga_config.CROSSOVER_PROBABILITY:
+                    toolbox.mate(child1, child2)
+                    del child1.fitness.values
+                    del child2.fitness.values
 
-        offspring = toolbox.select(population, len(population) - ga_config.ELITE_SIZE)
-        offspring = [toolbox.clone(ind) for ind in offspring]
+            for mutant in offspring:
+                if random.random() < ga_config.MUTATION_PROBABILITY:
+                    toolbox.mutate(mutant)
+                    del mutant.fitness.values
 
-        for child1, child2 in zip(offspring[::2], offspring[1::2]):
-            if random.random() < ga_config.CROSSOVER_PROBABILITY:
-                toolbox.mate(child1, child2)
-                del child1.fitness.values
-                del child2.fitness.values
+            invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
+            new_fitnesses = map(toolbox.evaluate, invalid_ind)
+            for ind, fit in zip(invalid_ind, new_fitnesses):
+                ind.fitness.values = fit
 
-        for mutant in offspring:
-            if random.random() < ga_config.MUTATION_PROBABILITY:
-                toolbox.mutate(mutant)
-                del mutant.fitness.values
+            population[:] = elites + offspring
 
-        invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
-        new_fitnesses = map(toolbox.evaluate, invalid_ind)
-        for ind, fit in zip(invalid_ind, new_fitnesses):
-            ind.fitness.values = fit
+            record = stats.compile(population)
+            if log_file:
+                # Records are streamed to disk instead of accumulating in memory
+                log_file.write(json.dumps({'gen': gen + 1, **record}) + '\n')
+                log_file.flush()
+            else:
+                logbook.record(gen=gen + 1, **record)
 
-        population[:] = elites + offspring
-        
-        record = stats.compile(population)
-        logbook.record(gen=gen + 1, **record)
-        
-        progress_value = (gen + 1) / ga_config.N_GENERATIONS
+            if checkpoint_dir:
+                is_last = gen + 1 == ga_config.N_GENERATIONS
+                due_by_gen = (gen + 1) % ga_config.CHECKPOINT_EVERY_N_GENERATIONS == 0
+                due_by_time = time.monotonic() - last_checkpoint_time >= ga_config.CHECKPOINT_EVERY_SECONDS
+                if is_last or due_by_gen or due_by_time:
+                    save_checkpoint(checkpoint_dir, population, gen + 1)
+                    last_checkpoint_time = time.monotonic()
 
-        best_score = record.get('fitness', 0.0)
-        progress_callback(progress_value, f"Generation {gen + 1}/{ga_config.N_GENERATIONS} - Best Score: {best_score:.4f}")
+            progress_value = (gen + 1) / ga_config.N_GENERATIONS
+
+            best_score = record.get('fitness', 0.0)
+            progress_callback(progress_value, f"Generation {gen + 1}/{ga_config.N_GENERATIONS} - Best Score: {best_score:.4f}")
+
+            if time_limit is not None and time.monotonic() - start_time >= time_limit:
+                break
+    finally:
+        if log_file:
+            log_file.close()
+
+    if checkpoint_dir:
+        for rec in _read_logbook_records(checkpoint_dir):
+            logbook.record(**rec)
 
     best_individual = tools.selBest(population, k=1)
-    
-    return best_individual, logbook
\ No newline at end of file
+
+    return best_individual, logbook
+
+# --- Checkpointing ---
+
+def save_checkpoint(checkpoint_dir, population, generation):
+    """
+    Writes the population, fitnesses, RNG state and generation counter as a
+    compressed .npz snapshot. The file is replaced atomically.
+    """
+    task_ids = sorted(task_id for task_id, _ in population[0])
+    id_index = {task_id: i for i, task_id in enumerate(task_ids)}
+
+    # Each individual is stored as its task order plus start slots, so the exact
+    # list layout (which the operators depend on) is restored on resume.
+    order = np.array([[id_index[task_id] for task_id, _ in ind] for ind in population], dtype=np.int32)
+    starts = np.array([[start for _, start in ind] for ind in population], dtype=np.int32)
+    fitnesses = np.array([ind.fitness.values[0] for ind in population], dtype=np.float64)
+
+    rng_version, rng_internal_state, rng_gauss_next = random.getstate()
+    ga_params = {name: getattr(ga_config, name) for name in GA_PARAM_NAMES}
+
+    path = os.path.join(checkpoint_dir, CHECKPOINT_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(
+            f,
+            task_ids=np.array(task_ids),
+            order=order,
+            starts=starts,
+            fitness=fitnesses,
+            generation=np.int64(generation),
+            rng_version=np.int64(rng_version),
+            rng_state=np.array(rng_internal_state, dtype=np.uint32),
+            rng_gauss_next=np.float64(np.nan if rng_gauss_next is None else rng_gauss_next),
+            ga_params=np.array(json.dumps(ga_params)),
+        )
+    os.replace(tmp_path, path)
+
+def load_checkpoint(checkpoint_dir):
+    """
+    Restores the population and RNG state from checkpoint_dir.
+    Returns (population, generation, ga_params).
+    """
+    individual_class = chromosome.register_types()
+    with np.load(os.path.join(checkpoint_dir, CHECKPOINT_FILE)) as data:
+        task_ids = [str(task_id) for task_id in data['task_ids']]
+        population = []
+        for order_row, start_row, fit in zip(data['order'], data['starts'], data['fitness']):
+            ind = individual_class((task_ids[i], int(start)) for i, start in zip(order_row, start_row))
+            ind.fitness.values = (float(fit),)
+            population.append(ind)
+
+        gauss_next = float(data['rng_gauss_next'])
+        random.setstate((
+            int(data['rng_version']),
+            tuple(int(x) for x in data['rng_state']),
+            None if np.isnan(gauss_next) else gauss_next,
+        ))
+        generation = int(data['generation'])
+        ga_params = json.loads(str(data['ga_params']))
+
+    return population, generation, ga_params
+
+def _read_logbook_records(checkpoint_dir):
+    path = os.path.join(checkpoint_dir, LOGBOOK_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
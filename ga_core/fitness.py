@@ -54,6 +54,14 @@ def calculate_fitness(individual, tasks_map, blocked_slots):
             except (ValueError, TypeError):
                 pass
 
+    for task_id, start_slot in individual:
+        task = tasks_map.get(task_id)
+        if task.get('occurrence_day') is not None:
+            day_start = task['occurrence_day'] * app_config.SLOTS_PER_DAY
+            end_slot = start_slot + task.get('estimated_time', 1)
+            if start_slot < day_start or end_slot > day_start + app_config.SLOTS_PER_DAY:
+                return (0.0,) # <<< Recurring instance outside its occurrence day returns 0.0
+
     # --- Soft Constraint Penalty Calculation ---
     total_penalty = 0.0
     
@@ -1,16 +1,30 @@
+import math
 import random
+from datetime import datetime
+import numpy as np
 from config import app_config, ga_config
 from deap import tools
 
+def iso_to_slot(value, schedule_start_dt):
+    """Converts an ISO datetime string to a (fractional) slot index, or None if invalid."""
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        return None
+    return (dt - schedule_start_dt).total_seconds() / (app_config.TIME_SLOT_DURATION * 60)
+
 def create_random_schedule(individual_class, task_instances, blocked_slots):
     """Creates a single random, but valid, schedule (an individual)."""
     schedule = []
     available_slots = list(set(range(app_config.TOTAL_TIME_SLOTS)) - set(blocked_slots))
-    random.shuffle(task_instances)
+    # Shuffle a copy so the caller's task list is left untouched
+    task_order = random.sample(task_instances, len(task_instances))
     
     scheduled_slots = set()
 
-    for task in task_instances:
+    for task in task_order:
         placed = False
         random.shuffle(available_slots)
         duration = task.get('estimated_time', 1)
@@ -58,6 +72,153 @@ def create_random_schedule(individual_class, task_instances, blocked_slots):
 
     return individual_class(schedule)
 
+def _dense_rank(values):
+    """Ranks values so that equal values share a rank (0 = smallest)."""
+    return np.unique(values, return_inverse=True)[1].reshape(-1).astype(np.float64)
+
+def create_population(individual_class, n, task_instances, blocked_slots):
+    """
+    Creates the whole starting population at once.
+    Every individual gets a task order and places its tasks one by one on the
+    first (heuristic seeds) or a random (other individuals) free start slot, with
+    all individuals processed together as NumPy arrays. Schedules do not overlap
+    and respect blocked time, earliest start times, occurrence days and precedence
+    whenever the horizon has room for them.
+    """
+    num_tasks = len(task_instances)
+    if n <= 0 or num_tasks == 0:
+        return [individual_class([]) for _ in range(max(n, 0))]
+
+    # Seed NumPy from the global RNG so random.seed() still makes runs reproducible
+    rng = np.random.default_rng(random.getrandbits(64))
+    total_slots = app_config.TOTAL_TIME_SLOTS
+    schedule_start_dt = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    instance_ids = [task['instance_id'] for task in task_instances]
+    durations = np.array([task.get('estimated_time', 1) for task in task_instances], dtype=np.int64)
+
+    release = np.zeros(num_tasks, dtype=np.int64)
+    # Slot by which a task must have finished; only recurring instances are bounded
+    due = np.full(num_tasks, total_slots, dtype=np.int64)
+    deadlines = np.full(num_tasks, np.inf)
+    priorities = np.full(num_tasks, np.inf)
+    for i, task in enumerate(task_instances):
+        earliest_start = iso_to_slot(task.get('earliest_start_time'), schedule_start_dt)
+        if earliest_start is not None:
+            release[i] = max(0, math.ceil(earliest_start))
+        if task.get('occurrence_day') is not None:
+            # Recurring instances must run within their occurrence day
+            day_start = task['occurrence_day'] * app_config.SLOTS_PER_DAY
+            release[i] = max(release[i], day_start)
+            due[i] = min(total_slots, day_start + app_config.SLOTS_PER_DAY)
+        deadline = iso_to_slot(task.get('deadline'), schedule_start_dt)
+        if deadline is not None:
+            deadlines[i] = deadline
+        if task.get('priority'):
+            priorities[i] = task['priority']
+
+    # Predecessors are matched like in calculate_fitness: the first instance of the original task
+    first_index_by_original = {}
+    for i, task in enumerate(task_instances):
+        first_index_by_original.setdefault(task.get('original_id'), i)
+    pred_index = np.array([first_index_by_original.get(task.get('predecessor_task_id'), -1)
+                           if task.get('predecessor_task_id') else -1
+                           for task in task_instances], dtype=np.int64)
+
+    # Depth in the precedence graph and the first task of each precedence chain
+    depth = np.zeros(num_tasks, dtype=np.float64)
+    root = np.arange(num_tasks)
+    for i in range(num_tasks):
+        j, steps = i, 0
+        while pred_index[j] >= 0 and pred_index[j] != j and steps < num_tasks:
+            j = pred_index[j]
+            steps += 1
+        depth[i] = steps
+        root[i] = j
+
+    # Work that must follow each task (longest chain of successors), so a task is
+    # not placed so late that its successors no longer fit in the horizon
+    tail = np.zeros(num_tasks, dtype=np.int64)
+    for i in np.argsort(-depth, kind='stable'):
+        p = pred_index[i]
+        if p >= 0 and p != i:
+            tail[p] = max(tail[p], durations[i] + tail[i])
+
+    # --- Task orders for the whole population ---
+    n_deadline = int(n * ga_config.INIT_HEURISTIC_SEEDS.get('deadline', 0.0))
+    n_priority = int(n * ga_config.INIT_HEURISTIC_SEEDS.get('priority', 0.0))
+    n_heuristic = min(n, n_deadline + n_priority)
+
+    # Noise below 1 only breaks ties between equal ranks
+    keys = rng.random((n, num_tasks))
+    keys[:n_deadline] += _dense_rank(deadlines)
+    keys[n_deadline:n_heuristic] += _dense_rank(priorities)
+    # Tasks with an earliest start time or a bounded day have the fewest valid slots, so they go first
+    keys[:, (release > 0) | (due < total_slots)] -= num_tasks + 1
+
+    # Each precedence chain is placed as one block, ordered by its most urgent member,
+    # predecessors first. Placing a chain back to back keeps room for its successors.
+    chain_keys = keys.copy()
+    for i in range(num_tasks):
+        chain_keys[:, root[i]] = np.minimum(chain_keys[:, root[i]], keys[:, i])
+    orders = np.lexsort((keys, np.broadcast_to(depth, keys.shape), chain_keys[:, root]), axis=1)
+
+    # --- Sequential placement, one task position at a time for all individuals ---
+    rows = np.arange(n)
+    slots = np.arange(total_slots)
+    blocked_mask = np.zeros(total_slots, dtype=bool)
+    blocked_mask[[slot for slot in blocked_slots if 0 <= slot < total_slots]] = True
+    occupied = np.tile(blocked_mask, (n, 1))
+    starts = np.zeros((n, num_tasks), dtype=np.int64)
+    finishes = np.zeros((n, num_tasks), dtype=np.int64)
+
+    # Heuristic seeds take the earliest feasible slot; the others a random one
+    preference = rng.random((n, total_slots))
+    preference[:n_heuristic] = 1.0 - slots / total_slots
+
+    for position in range(num_tasks):
+        tasks = orders[:, position]
+        duration = durations[tasks]
+        preds = pred_index[tasks]
+        pred_finish = np.where(preds >= 0, finishes[rows, np.maximum(preds, 0)], 0)
+        earliest = np.maximum(release[tasks], pred_finish)
+
+        # A start is free if no slot in [start, start + duration) is occupied
+        occupied_count = np.zeros((n, total_slots + 1), dtype=np.int64)
+        np.cumsum(occupied, axis=1, out=occupied_count[:, 1:])
+        end = slots[None, :] + duration[:, None]
+        fits = end <= total_slots
+        busy = occupied_count[rows[:, None], np.minimum(end, total_slots)] - occupied_count[:, :total_slots]
+        free = fits & (busy == 0)
+        feasible = free & (slots[None, :] >= earliest[:, None]) & (end <= due[tasks][:, None])
+        # Free slots left between the end of the task and the end of the horizon
+        clipped_end = np.minimum(end, total_slots)
+        free_after = (total_slots - clipped_end) - (occupied_count[:, -1:] - occupied_count[rows[:, None], clipped_end])
+        leaves_room = free_after >= tail[tasks][:, None]
+        # Prefer starts that leave room for the successors when there are any
+        preferred = feasible & leaves_room
+        feasible = np.where(preferred.any(axis=1)[:, None], preferred, feasible)
+
+        choice = np.argmax(np.where(feasible, preference, -1.0), axis=1)
+        # Fallback like create_random_schedule: the first free slot, ignoring start constraints
+        fallback = np.argmax(free, axis=1)
+        placed = feasible.any(axis=1)
+        has_fallback = ~placed & free.any(axis=1)
+        # If nothing fits, the task goes to slot 0 and the fitness function eliminates it
+        start = np.where(placed, choice, np.where(has_fallback, fallback, 0))
+
+        marks = (placed | has_fallback)[:, None] & (slots[None, :] >= start[:, None]) & (slots[None, :] < (start + duration)[:, None])
+        occupied |= marks
+        starts[rows, tasks] = start
+        finishes[rows, tasks] = start + duration
+
+    population = []
+    for r in range(n):
+        order = orders[r].tolist()
+        row_starts = starts[r].tolist()
+        population.append(individual_class((instance_ids[i], row_starts[i]) for i in order))
+    return population
+
 def custom_crossover(ind1, ind2, task_instances):
     """Custom time-slot based crossover operator with repair."""
     cut_point = random.randint(0, app_config.TOTAL_TIME_SLOTS)
@@ -83,7 +244,8 @@ def repair_schedule(child_tasks, all_task_instances):
     scheduled_ids = set(child_tasks.keys())
 
     # Add tasks that are correctly present
-    for task_id in scheduled_ids.intersection(all_instance_ids):
+    # Iterate in sorted order so results do not depend on string hash randomization
+    for task_id in sorted(scheduled_ids.intersection(all_instance_ids)):
         final_schedule.append((task_id, child_tasks[task_id]))
 
     # Identify missing tasks
@@ -103,7 +265,7 @@ def repair_schedule(child_tasks, all_task_instances):
         available_slots = list(set(range(app_config.TOTAL_TIME_SLOTS)) - occupied_slots)
         random.shuffle(available_slots)
 
-        for task_id in missing_ids:
+        for task_id in sorted(missing_ids):
             if available_slots:
                 start_slot = available_slots.pop(0) # Use pop(0) for some predictability
                 final_schedule.append((task_id, start_slot))
@@ -114,10 +276,72 @@ def repair_schedule(child_tasks, all_task_instances):
     return final_schedule
 
 
-def custom_mutation(individual, blocked_slots):
-    """Applies one of several intelligent mutation operators to a schedule."""
+def get_recurrence_groups(task_instances):
+    """
+    Returns {instance_id: group} for instances of recurring tasks, where group is
+    the tuple of interchangeable instance ids ordered by occurrence day.
+    """
+    members_by_group = {}
+    for task in task_instances:
+        if task.get('recurrence_group') is not None:
+            members_by_group.setdefault(task['recurrence_group'], []).append(task)
+
+    group_of = {}
+    for members in members_by_group.values():
+        if len(members) < 2:
+            continue
+        group = tuple(t['instance_id'] for t in sorted(members, key=lambda t: t['occurrence_day']))
+        for instance_id in group:
+            group_of[instance_id] = group
+    return group_of
+
+def get_occurrence_windows(task_instances):
+    """
+    Returns {instance_id: (first_start, last_start)} for recurring instances, the
+    range of start slots that keeps each occurrence within its own day.
+    """
+    windows = {}
+    for task in task_instances:
+        if task.get('occurrence_day') is not None:
+            first_start = task['occurrence_day'] * app_config.SLOTS_PER_DAY
+            last_start = first_start + app_config.SLOTS_PER_DAY - task.get('estimated_time', 1)
+            windows[task['instance_id']] = (first_start, max(first_start, last_start))
+    return windows
+
+def _in_window(task_id, start_slot, windows):
+    window = windows.get(task_id)
+    return window is None or window[0] <= start_slot <= window[1]
+
+def canonicalize_schedule(individual, group_of):
+    """
+    Relabels interchangeable instances of a recurring task so that the k-th earliest
+    occurrence always carries the k-th instance id. Schedules that differ only by a
+    permutation of identical instances become the same individual.
+    """
+    if not group_of:
+        return individual
+
+    positions_by_group = {}
+    for index, (task_id, _) in enumerate(individual):
+        group = group_of.get(task_id)
+        if group is not None:
+            positions_by_group.setdefault(group, []).append(index)
+
+    for group, positions in positions_by_group.items():
+        starts = sorted(individual[index][1] for index in positions)
+        for index, instance_id, start in zip(positions, group, starts):
+            individual[index] = (instance_id, start)
+
+    return individual
+
+def custom_mutation(individual, blocked_slots, group_of=None, windows=None):
+    """
+    Applies one of several intelligent mutation operators to a schedule.
+    windows (see get_occurrence_windows) keeps recurring instances within their day.
+    """
     if not individual:
         return individual,
+    windows = windows or {}
 
     # Choose a mutation type based on predefined probabilities
     mutation_type = random.choices(
@@ -132,7 +356,8 @@ def custom_mutation(individual, blocked_slots):
             task_index = random.randint(0, len(individual) - 1)
             task_id, _ = individual[task_index]
             
-            available_slots = list(set(range(app_config.TOTAL_TIME_SLOTS)) - set(blocked_slots))
+            first_start, last_start = windows.get(task_id, (0, app_config.TOTAL_TIME_SLOTS - 1))
+            available_slots = list(set(range(first_start, last_start + 1)) - set(blocked_slots))
             if available_slots:
                 new_start_slot = random.choice(available_slots)
                 individual[task_index] = (task_id, new_start_slot)
@@ -140,11 +365,20 @@ def custom_mutation(individual, blocked_slots):
     elif mutation_type == "swap":
         # Swap the start times of two random tasks
         if len(individual) >= 2:
-            idx1, idx2 = random.sample(range(len(individual)), 2)
+            idx1 = random.randint(0, len(individual) - 1)
+            # Swapping two instances of the same recurring task does not change the schedule
+            group_of = group_of or {}
             task1_id, start1 = individual[idx1]
-            task2_id, start2 = individual[idx2]
-            individual[idx1] = (task1_id, start2)
-            individual[idx2] = (task2_id, start1)
+            group1 = group_of.get(task1_id, task1_id)
+            # Recurring instances only swap with tasks whose start keeps both within their days
+            candidates = [i for i, (task_id, start) in enumerate(individual)
+                          if group_of.get(task_id, task_id) != group1
+                          and _in_window(task1_id, start, windows) and _in_window(task_id, start1, windows)]
+            if candidates:
+                idx2 = random.choice(candidates)
+                task2_id, start2 = individual[idx2]
+                individual[idx1] = (task1_id, start2)
+                individual[idx2] = (task2_id, start1)
 
     elif mutation_type == "creep":
         # Slightly shift a random task's start time
@@ -153,7 +387,8 @@ def custom_mutation(individual, blocked_slots):
             task_id, start_slot = individual[task_index]
             
             shift = random.randint(-5, 5) # Creep range
-            new_start_slot = max(0, min(app_config.TOTAL_TIME_SLOTS - 1, start_slot + shift))
+            first_start, last_start = windows.get(task_id, (0, app_config.TOTAL_TIME_SLOTS - 1))
+            new_start_slot = max(first_start, min(last_start, start_slot + shift))
             
             if new_start_slot not in blocked_slots:
                 individual[task_index] = (task_id, new_start_slot)
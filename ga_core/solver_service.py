@@ -0,0 +1,255 @@
+import heapq
+import itertools
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config import app_config, ga_config
+from ga_core import chromosome
+from ga_core.workers import get_worker_context
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class SessionLimitError(RuntimeError):
+    """Raised when a session already has the maximum number of active jobs."""
+
+
+class SolverJob:
+    """State of a single optimization request submitted to the solver service."""
+
+    def __init__(self, session_id, priority, solve_fn, kwargs, ga_params):
+        self.job_id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.priority = priority
+        self.solve_fn = solve_fn
+        self.kwargs = kwargs
+        self.ga_params = ga_params
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+
+    def done(self):
+        return self.status in (DONE, FAILED)
+
+
+def _run_job(job_id, solve_fn, kwargs, ga_params, progress_queue):
+    """Runs a solver function inside a worker process and reports progress back."""
+    # Each worker is a separate process, so overriding the module-level
+    # GA parameters here does not leak into other sessions.
+    for name, value in ga_params.items():
+        setattr(ga_config, name, value)
+
+    def progress_callback(progress_value, message):
+        progress_queue.put((job_id, progress_value, message))
+
+    return solve_fn(progress_callback=progress_callback, **kwargs)
+
+
+class SolverService:
+    """
+    Process-wide solver shared by all Streamlit sessions.
+    Jobs wait in a priority queue (lower value first, FIFO within a priority)
+    and are dispatched to a bounded pool of worker processes.
+    """
+
+    def __init__(self, max_workers=None, max_jobs_per_session=None):
+        self.max_workers = max_workers or app_config.SOLVER_MAX_WORKERS
+        self.max_jobs_per_session = max_jobs_per_session or app_config.SOLVER_MAX_JOBS_PER_SESSION
+
+        # Results contain DEAP individuals, so their classes must exist in this process
+        chromosome.register_types()
+
+        context = get_worker_context()
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        self._manager = context.Manager()
+        self._progress_queue = self._manager.Queue()
+
+        self._condition = threading.Condition()
+        self._queue = []
+        self._counter = itertools.count()
+        self._jobs = {}
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._wait_times = deque(maxlen=app_config.SOLVER_METRICS_WINDOW)
+        self._run_times = deque(maxlen=app_config.SOLVER_METRICS_WINDOW)
+        self._closed = False
+
+        threading.Thread(target=self._dispatch_loop, name="solver-dispatch", daemon=True).start()
+        threading.Thread(target=self._progress_loop, name="solver-progress", daemon=True).start()
+
+    def submit(self, session_id, solve_fn, kwargs, ga_params=None, priority=0):
+        """Queues a solver call and returns its SolverJob."""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Solver service has been shut down.")
+            self._prune_finished_jobs()
+
+            active_jobs = sum(1 for job in self._jobs.values()
+                              if job.session_id == session_id and not job.done())
+            if active_jobs >= self.max_jobs_per_session:
+                raise SessionLimitError(
+                    f"Session already has {active_jobs} active job(s) (limit {self.max_jobs_per_session})."
+                )
+
+            job = SolverJob(session_id, priority, solve_fn, kwargs, dict(ga_params or {}))
+            self._jobs[job.job_id] = job
+            heapq.heappush(self._queue, (priority, next(self._counter), job.job_id))
+            self._condition.notify_all()
+            return job
+
+    def get_job(self, job_id):
+        with self._condition:
+            return self._jobs.get(job_id)
+
+    def queue_position(self, job_id):
+        """Returns the 1-based position of a queued job, or 0 once it has left the queue."""
+        with self._condition:
+            for position, (_, _, queued_id) in enumerate(sorted(self._queue), start=1):
+                if queued_id == job_id:
+                    return position
+            return 0
+
+    def wait(self, job_id, timeout=None):
+        """Blocks until the job has finished or the timeout expires."""
+        with self._condition:
+            job = self._jobs[job_id]
+            self._condition.wait_for(job.done, timeout=timeout)
+            return job
+
+    def collect(self, job_id):
+        """Removes a finished job and returns its result, re-raising any worker error."""
+        with self._condition:
+            job = self._jobs[job_id]
+            if not job.done():
+                raise RuntimeError(f"Job {job_id} has not finished yet.")
+            del self._jobs[job_id]
+        if job.status == FAILED:
+            raise job.error
+        return job.result
+
+    def metrics(self):
+        """Returns a snapshot of queue depth, utilization and latency statistics."""
+        with self._condition:
+            latencies = sorted(w + r for w, r in zip(self._wait_times, self._run_times))
+            return {
+                "queue_depth": len(self._queue),
+                "running": self._running,
+                "max_workers": self.max_workers,
+                "completed": self._completed,
+                "failed": self._failed,
+                "avg_wait_seconds": _mean(self._wait_times),
+                "avg_run_seconds": _mean(self._run_times),
+                "p95_latency_seconds": latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+            }
+
+    def shutdown(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._manager.shutdown()
+
+    # --- Internal helpers ---
+
+    def _dispatch_loop(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._closed or (self._queue and self._running < self.max_workers)
+                )
+                if self._closed:
+                    return
+                _, _, job_id = heapq.heappop(self._queue)
+                job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                job.status = RUNNING
+                job.started_at = time.monotonic()
+                self._running += 1
+
+            future = None
+            for _ in range(2):
+                executor = self._executor
+                try:
+                    future = executor.submit(
+                        _run_job, job.job_id, job.solve_fn, job.kwargs, job.ga_params, self._progress_queue
+                    )
+                    break
+                except BrokenProcessPool as e:
+                    # Retry once on a fresh pool
+                    error = e
+                    self._replace_broken_pool(executor)
+                except Exception as e:
+                    error = e
+                    break
+            if future is None:
+                self._finish(job, None, executor, error)
+                continue
+            future.add_done_callback(lambda f, job=job, executor=executor: self._finish(job, f, executor))
+
+    def _replace_broken_pool(self, broken_executor):
+        """Swaps in a new worker pool after a worker process died (e.g. out of memory)."""
+        with self._condition:
+            if self._closed or self._executor is not broken_executor:
+                return
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=get_worker_context())
+        broken_executor.shutdown(wait=False, cancel_futures=True)
+
+    def _finish(self, job, future, executor, error=None):
+        """Records a job's outcome; future is None if the job could not be submitted."""
+        if future is not None:
+            error = CancelledError() if future.cancelled() else future.exception()
+            if isinstance(error, BrokenProcessPool):
+                self._replace_broken_pool(executor)
+        with self._condition:
+            self._running -= 1
+            job.finished_at = time.monotonic()
+            if error is None:
+                job.result = future.result()
+                job.status = DONE
+                job.progress = 1.0
+                self._completed += 1
+            else:
+                job.error = error
+                job.status = FAILED
+                self._failed += 1
+            self._wait_times.append(job.started_at - job.submitted_at)
+            self._run_times.append(job.finished_at - job.started_at)
+            self._condition.notify_all()
+
+    def _progress_loop(self):
+        while not self._closed:
+            try:
+                job_id, progress_value, message = self._progress_queue.get()
+            except (EOFError, OSError):
+                return
+            with self._condition:
+                job = self._jobs.get(job_id)
+                if job is not None and not job.done():
+                    job.progress = progress_value
+                    job.message = message
+
+    def _prune_finished_jobs(self):
+        # Sessions that are closed mid-job never collect it, so drop stale results.
+        now = time.monotonic()
+        stale = [job_id for job_id, job in self._jobs.items()
+                 if job.done() and now - job.finished_at > app_config.SOLVER_FINISHED_JOB_TTL]
+        for job_id in stale:
+            del self._jobs[job_id]
+
+
+def _mean(values):
+    return sum(values) / len(values) if values else 0.0
@@ -0,0 +1,218 @@
+"""
+Hyperparameter racing harness for the GA.
+
+Candidate configurations are sampled from the same ranges as the sidebar
+sliders and raced with successive halving: every round runs all surviving
+candidates on every task file (and seed) in parallel with the round's budget,
+keeps the best 1/eta of them and multiplies the budget by eta, until one
+candidate is left or the next budget would exceed the maximum.
+
+Example, from the project root:
+    python -m ga_core.tuning data/sample_tasks.json data/sample_tasks_1.json --profile tuned
+"""
+import argparse
+import json
+import math
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from config import app_config, ga_config, profiles
+from ga_core.engine import run_ga_optimization
+from ga_core.workers import get_worker_context
+from utils.helpers import expand_task_instances, parse_blocked_times, prepare_tasks_for_ga
+
+# (low, high, step) for each tuned parameter; matches the ranges offered in app.py
+SEARCH_SPACE = {
+    "POPULATION_SIZE": (10, 500, 10),
+    "MUTATION_PROBABILITY": (0.01, 1.0, 0.01),
+    "CROSSOVER_PROBABILITY": (0.1, 1.0, 0.05),
+    "ELITE_SIZE": (1, 10, 1),
+    "TOURNAMENT_SIZE": (2, 7, 1),
+}
+
+# Upper bound on generations when racing on a time budget
+MAX_GENERATIONS_PER_RUN = 1000
+
+def sample_candidates(count, rng):
+    """Draws random configurations on the grid defined by SEARCH_SPACE."""
+    candidates = []
+    for _ in range(count):
+        params = {}
+        for name, (low, high, step) in SEARCH_SPACE.items():
+            value = low + step * rng.randint(0, int(round((high - low) / step)))
+            params[name] = round(value, 4) if isinstance(step, float) else int(value)
+        # Keep at least half of the population for offspring
+        params["ELITE_SIZE"] = max(1, min(params["ELITE_SIZE"], params["POPULATION_SIZE"] // 2))
+        candidates.append(params)
+    return candidates
+
+_problem_cache = {}
+
+def _load_problem(task_file, blocked_times):
+    """Loads and prepares a task file once per worker process."""
+    key = (task_file, blocked_times)
+    if key not in _problem_cache:
+        with open(task_file, 'r', encoding='utf-8') as f:
+            tasks = prepare_tasks_for_ga(json.load(f))
+        task_instances = expand_task_instances(tasks)
+        tasks_map = {task['instance_id']: task for task in task_instances}
+        _problem_cache[key] = (tasks_map, task_instances, parse_blocked_times(blocked_times))
+    return _problem_cache[key]
+
+def _run_candidate(params, task_file, seed, budget_type, budget, blocked_times):
+    """Runs one configuration on one task file; executed in a worker process."""
+    tasks_map, task_instances, blocked_slots = _load_problem(task_file, blocked_times)
+    for name, value in params.items():
+        setattr(ga_config, name, value)
+
+    if budget_type == "evaluations":
+        ga_config.N_GENERATIONS = max(1, int(budget // params["POPULATION_SIZE"]))
+        time_limit = None
+    else:
+        ga_config.N_GENERATIONS = MAX_GENERATIONS_PER_RUN
+        time_limit = budget
+
+    start = time.perf_counter()
+    best_individual, logbook = run_ga_optimization(
+        tasks_map, task_instances, blocked_slots, progress_callback=lambda *_: None,
+        seed=seed, time_limit=time_limit
+    )
+    return {
+        "fitness": best_individual[0].fitness.values[0],
+        "generations": len(logbook),
+        "seconds": time.perf_counter() - start,
+    }
+
+def race(task_files, n_candidates=27, eta=3, budget_type="evaluations", min_budget=None,
+         max_budget=None, seeds=(0,), workers=None, blocked_times=app_config.DEFAULT_BLOCKED_TIMES,
+         rng_seed=0, log=print):
+    """
+    Races candidate configurations with successive halving.
+    Returns every candidate ranked by the last round it reached, then by its score
+    in that round, best first. Each entry also lists its results from all rounds.
+    """
+    if budget_type == "evaluations":
+        min_budget = min_budget or 2000
+        max_budget = max_budget or 50000
+    else:
+        min_budget = min_budget or 1.0
+        max_budget = max_budget or 30.0
+
+    all_candidates = [{"id": i, "params": params}
+                      for i, params in enumerate(sample_candidates(n_candidates, random.Random(rng_seed)))]
+    candidates = all_candidates
+    budget = min_budget
+    history = {candidate["id"]: [] for candidate in all_candidates}
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_worker_context()) as executor:
+        round_number = 0
+        while True:
+            round_number += 1
+            log(f"Round {round_number}: {len(candidates)} candidates, budget {budget:g} {budget_type}")
+            jobs = {}
+            for candidate in candidates:
+                for task_file in task_files:
+                    for seed in seeds:
+                        future = executor.submit(_run_candidate, candidate["params"], task_file, seed,
+                                                 budget_type, budget, blocked_times)
+                        jobs[future] = (candidate["id"], task_file)
+
+            runs = {}
+            for future, (candidate_id, task_file) in jobs.items():
+                runs.setdefault(candidate_id, []).append((task_file, future.result()))
+
+            # Fitness scales differ between task files, so scores are relative to
+            # the best fitness any candidate reached on the same file this round
+            best_per_file = {}
+            for results in runs.values():
+                for task_file, result in results:
+                    best_per_file[task_file] = max(best_per_file.get(task_file, 0.0), result["fitness"])
+
+            round_results = []
+            for candidate in candidates:
+                results = runs[candidate["id"]]
+                round_results.append({
+                    "id": candidate["id"],
+                    "round": round_number,
+                    "budget": budget,
+                    "score": statistics.mean(
+                        result["fitness"] / best_per_file[task_file] if best_per_file[task_file] > 0 else 0.0
+                        for task_file, result in results
+                    ),
+                    "mean_fitness": statistics.mean(result["fitness"] for _, result in results),
+                    "mean_generations": statistics.mean(result["generations"] for _, result in results),
+                    "mean_seconds": statistics.mean(result["seconds"] for _, result in results),
+                })
+            for entry in round_results:
+                history[entry["id"]].append(entry)
+
+            if budget * eta > max_budget:
+                break
+            round_results.sort(key=lambda entry: entry["score"], reverse=True)
+            survivors = {entry["id"] for entry in round_results[:max(1, math.ceil(len(round_results) / eta))]}
+            if len(survivors) <= 1:
+                break
+            candidates = [candidate for candidate in candidates if candidate["id"] in survivors]
+            budget *= eta
+
+    # Candidates that survived longer ran with larger budgets, so they rank first
+    ranked = []
+    for candidate in all_candidates:
+        rounds = history[candidate["id"]]
+        ranked.append({**candidate, **rounds[-1], "rounds": rounds})
+    ranked.sort(key=lambda entry: (entry["round"], entry["score"]), reverse=True)
+    return ranked
+
+def profile_from_result(entry):
+    """Turns a race result into GA parameters, including the generations the budget allowed."""
+    params = dict(entry["params"])
+    params["N_GENERATIONS"] = max(1, int(round(entry["mean_generations"])))
+    return params
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune GA parameters by racing configurations.")
+    parser.add_argument("task_files", nargs="+", help="JSON task files to tune on")
+    parser.add_argument("--candidates", type=int, default=27, help="number of sampled configurations")
+    parser.add_argument("--eta", type=int, default=3, help="fraction (1/eta) of candidates kept per round")
+    parser.add_argument("--budget-type", choices=["evaluations", "seconds"], default="evaluations",
+                        help="evaluations = population size x generations; seconds = wall time per run")
+    parser.add_argument("--min-budget", type=float, help="budget per run in the first round")
+    parser.add_argument("--max-budget", type=float, help="largest budget per run")
+    parser.add_argument("--seeds", type=int, default=2, help="runs per task file and candidate")
+    parser.add_argument("--workers", type=int, help="number of worker processes (default: CPU count)")
+    parser.add_argument("--blocked-times", help="file with blocked times (default: app_config.DEFAULT_BLOCKED_TIMES)")
+    parser.add_argument("--profile", default="tuned", help="name of the profile to write")
+    parser.add_argument("--report", default="tuning_report.json", help="path of the JSON report")
+    args = parser.parse_args()
+
+    blocked_times = app_config.DEFAULT_BLOCKED_TIMES
+    if args.blocked_times:
+        with open(args.blocked_times, 'r', encoding='utf-8') as f:
+            blocked_times = f.read()
+
+    ranked = race(
+        args.task_files, n_candidates=args.candidates, eta=args.eta, budget_type=args.budget_type,
+        min_budget=args.min_budget, max_budget=args.max_budget, seeds=tuple(range(args.seeds)),
+        workers=args.workers, blocked_times=blocked_times,
+    )
+
+    print(f"\n{'rank':>4} {'round':>5} {'score':>7} {'fitness':>12} {'gens':>6} {'secs':>6}  params")
+    for rank, entry in enumerate(ranked, start=1):
+        print(f"{rank:>4} {entry['round']:>5} {entry['score']:>7.3f} {entry['mean_fitness']:>12.4g} "
+              f"{entry['mean_generations']:>6.0f} {entry['mean_seconds']:>6.2f}  {entry['params']}")
+
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump({"task_files": args.task_files, "budget_type": args.budget_type, "ranking": ranked}, f, indent=4)
+
+    path = profiles.save_profile(args.profile, profile_from_result(ranked[0]), metadata={
+        "tuned_on": args.task_files,
+        "budget_type": args.budget_type,
+        "budget": ranked[0]["budget"],
+        "score": ranked[0]["score"],
+    })
+    print(f"\nReport written to {args.report}; profile '{args.profile}' written to {path}")
+
+if __name__ == "__main__":
+    main()
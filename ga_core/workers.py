@@ -0,0 +1,17 @@
+import multiprocessing
+
+# Modules imported once by the fork server, so each new worker starts with the solver loaded.
+# Only the lean solver path (DEAP + NumPy) belongs here, never the UI or plotting libraries.
+PRELOAD_MODULES = ["ga_core.engine", "ga_core.decomposition", "ga_core.solver_service"]
+
+def get_worker_context():
+    """
+    Returns the multiprocessing context for solver worker processes.
+    Uses a fork server with the solver preloaded where available and falls back to spawn.
+    Both avoid forking the Streamlit server together with its threads.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(PRELOAD_MODULES)
+        return context
+    return multiprocessing.get_context("spawn")
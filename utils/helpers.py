@@ -1,8 +1,9 @@
 import json
-import pandas as pd
 from datetime import datetime, timedelta
 from config import app_config
-import plotly.express as px
+
+# pandas and plotly are imported inside the functions that use them, so solver
+# workers that only need the parsing helpers do not pay for loading them.
 
 def load_tasks_from_json(filepath):
     """Parses the user-provided JSON file into a list of task dictionaries."""
@@ -16,6 +17,8 @@ def load_tasks_from_json(filepath):
     
 def create_gantt_chart(schedule_df):
     """Creates a Plotly Gantt chart from a schedule DataFrame."""
+    import plotly.express as px
+
     if schedule_df.empty:
         return px.timeline()
 
@@ -36,7 +39,7 @@ def create_gantt_chart(schedule_df):
     
     return fig
 
-def parse_blocked_times(blocked_times_str):
+def parse_blocked_times(blocked_times_str, days=app_config.DAYS_IN_SCHEDULE):
     """Parses the user's text input for blocked times into a set of blocked slot indices."""
     blocked_slots = set()
     lines = blocked_times_str.strip().split('\n')
@@ -69,7 +72,7 @@ def parse_blocked_times(blocked_times_str):
                 for slot in range(0, end_slot_of_day):
                     blocked_slots.add(slot)
 
-            for day in range(app_config.DAYS_IN_SCHEDULE):
+            for day in range(days):
                 day_offset = day * app_config.SLOTS_PER_DAY
                 
                 # Standard same-day block
@@ -83,16 +86,118 @@ def parse_blocked_times(blocked_times_str):
                         blocked_slots.add(day_offset + slot)
                     
                     # Block the next day's morning (if it's within the schedule)
-                    if day + 1 < app_config.DAYS_IN_SCHEDULE:
+                    if day + 1 < days:
                         next_day_offset = (day + 1) * app_config.SLOTS_PER_DAY
                         for slot in range(0, end_slot_of_day):
                             blocked_slots.add(next_day_offset + slot)
 
     return blocked_slots
 
+def prepare_tasks_for_ga(tasks):
+    """Converts task durations from hours to time slots and fills in missing optional fields."""
+    final_tasks = []
+    for task in tasks:
+        processed_task = task.copy()
+        time_in_hours = processed_task.pop('estimated_time_hr', task.get('estimated_time'))
+        if time_in_hours is not None:
+            try:
+                slots = int(float(time_in_hours) * 60 / app_config.TIME_SLOT_DURATION)
+                processed_task['estimated_time'] = max(1, slots)
+            except (ValueError, TypeError):
+                processed_task['estimated_time'] = 1
+
+        for key in ['predecessor_task_id', 'deadline', 'earliest_start_time', 'recurrence']:
+            if not processed_task.get(key):
+                processed_task[key] = None
+        final_tasks.append(processed_task)
+    return final_tasks
+
+WEEKDAY_NAMES = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+def parse_recurrence(rule):
+    """
+    Parses a task's recurrence rule into the set of weekdays (0 = Monday) it repeats on.
+    Supported rules: 'daily', 'weekdays', 'weekends' or a comma-separated list of day names, e.g. 'mon,wed,fri'.
+    """
+    if not rule or not isinstance(rule, str):
+        return set()
+
+    rule = rule.strip().lower()
+    if rule == 'daily':
+        return set(range(7))
+    if rule == 'weekdays':
+        return set(range(5))
+    if rule == 'weekends':
+        return {5, 6}
+
+    weekdays = set()
+    for name in rule.split(','):
+        name = name.strip()[:3]
+        if name in WEEKDAY_NAMES:
+            weekdays.add(WEEKDAY_NAMES.index(name))
+        # Skip unknown day names
+    return weekdays
+
+def _recurrence_day_range(task, schedule_start_dt, days):
+    """Returns the [first, end) schedule days allowed by a task's earliest start and deadline."""
+    first_day, end_day = 0, days
+    try:
+        if task.get('earliest_start_time'):
+            earliest_start_dt = datetime.fromisoformat(task['earliest_start_time'])
+            first_day = max(first_day, (earliest_start_dt - schedule_start_dt).days)
+        if task.get('deadline'):
+            deadline_dt = datetime.fromisoformat(task['deadline'])
+            # A day is kept if it begins before the deadline
+            end_day = min(end_day, -((schedule_start_dt - deadline_dt) // timedelta(days=1)))
+    except (ValueError, TypeError):
+        pass
+    return first_day, end_day
+
+def expand_task_instances(tasks, days=app_config.DAYS_IN_SCHEDULE):
+    """
+    Turns tasks into GA task instances. A recurring task becomes one instance per
+    matching day in the schedule; these share a 'recurrence_group' and record the
+    day of their occurrence in 'occurrence_day'. For a recurring task the earliest
+    start time and deadline bound the recurrence: days that end before the earliest
+    start or begin at or after the deadline get no instance.
+    """
+    schedule_start_dt = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    first_weekday = schedule_start_dt.weekday()
+    task_instances = []
+
+    for i, task_data in enumerate(tasks):
+        weekdays = parse_recurrence(task_data.get('recurrence'))
+        if weekdays:
+            first_day, end_day = _recurrence_day_range(task_data, schedule_start_dt, days)
+            occurrence_days = [day for day in range(first_day, end_day) if (first_weekday + day) % 7 in weekdays]
+            if not occurrence_days:
+                # The recurrence does not fall within the schedule
+                continue
+        else:
+            occurrence_days = []
+
+        if not occurrence_days:
+            instance = task_data.copy()
+            instance['instance_id'] = f"task_{i}"
+            instance['original_id'] = task_data.get('id', i)
+            task_instances.append(instance)
+            continue
+
+        for k, day in enumerate(occurrence_days):
+            instance = task_data.copy()
+            instance['instance_id'] = f"task_{i}_{k}"
+            instance['original_id'] = task_data.get('id', i)
+            instance['recurrence_group'] = f"task_{i}"
+            instance['occurrence_day'] = day
+            task_instances.append(instance)
+
+    return task_instances
+
 
 def convert_schedule_to_dataframe(schedule, tasks_map):
     """Transforms the final GA output into a structured Pandas DataFrame for visualization."""
+    import pandas as pd
+
     if not schedule:
         return pd.DataFrame()
 